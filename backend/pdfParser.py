@@ -2,59 +2,175 @@
 """
 PDF Parser using pdfminer.six for better table extraction
 This preserves layout and spacing properly
+
+Text is extracted with PyMuPDF when it is installed (its C core is far faster
+than pdfminer's pure-Python layout analysis); pdfminer's layout analysis is
+only used as a fallback, including when the fast text yields no usable table
+or a report's ratings. PyMuPDF is AGPL-licensed, so it is an
+opt-in install rather than a requirement (see PYTHON_SETUP.md).
+
+Usage: pdfParser.py <pdf_path> [--debug] [--strict-layout] [--pretty]
+  --debug (or PDFPARSER_DEBUG=1) prints diagnostics to stderr and saves the
+          extracted text next to the PDF
+  --strict-layout skips PyMuPDF and always uses pdfminer's layout analysis
+  --pretty indents the JSON output (compact by default)
 """
 
+import array
+import os
 import sys
 import json
 import re
-from io import StringIO
-from pdfminer.high_level import extract_text_to_fp
+from pdfminer.high_level import extract_text, extract_text_to_fp
 from pdfminer.layout import LAParams
 
+try:
+    import pymupdf
+except ImportError:  # Optional: fall back to pdfminer only
+    pymupdf = None
+
+# Debug output (stderr diagnostics, extracted text dump) is opt-in; a plain
+# membership test keeps flag handling cheap without pulling in argparse
+_DEBUG = bool(os.environ.get('PDFPARSER_DEBUG')) or '--debug' in sys.argv
+
+# Less text than this from PyMuPDF (e.g. a scanned PDF) triggers the pdfminer fallback
+_MIN_TEXT_LENGTH = 100
+
+# Fewer Section Profile entries than this from the PyMuPDF text triggers a
+# re-extraction with pdfminer's layout analysis
+_MIN_FAST_PATH_ENTRIES = 3
+
+def _dbg(*args):
+    """Print a diagnostic line to stderr, only in debug mode"""
+    if _DEBUG:
+        print(*args, file=sys.stderr)
+
+# Patterns are compiled once at import time; the extractors below run them
+# per line / per report, which would otherwise keep hitting re's small cache.
+
+# Section Profile
+_SECTION_PROFILE_RE = re.compile(r'Section Profile(.*?)(?=Inspection report|$)', re.DOTALL | re.IGNORECASE)
+_ROW_RE = re.compile(r'\s*(\d+)\s+(\d+)\s+([\d\-A-Z]+)\s+([\d\-A-Z]+)\s+(\d{1,2}/\d{1,2}/\d{4})\s+([A-Z]+)\s+([\d.]+)\s+([\d.]+)')
+_MH_ID_RE = re.compile(r'^\d{2,3}-\d{2}-\d{2}-\d{3}[A-Z]?$')
+_DATE_RE = re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$')
+_LEN_RE = re.compile(r'^\d+\.\d{2}$')
+_HEADER_PREFIXES = ('No.', 'PSR', 'Upstream', 'Circular', 'Surveyed')
+_MATERIALS = frozenset({'VCP', 'PVC', 'RCP', 'CMP', 'DIP'})
+
+# Inspection reports
+_INSPECTION_SPLIT_RE = re.compile(r'Inspection report', re.IGNORECASE)
+_DATE_FIELD_RE = re.compile(r'Date:\s*(\d{1,2}/\d{1,2}/\d{4})')
+_CERT_RE = re.compile(r'Certificate Number:\s*([\w\-]+)')
+_PSR_RES = (
+    re.compile(r'Pipe\s+Segment\s+Ref\.?:?\s*(\d+)', re.IGNORECASE),
+    re.compile(r'PSR\s*:?\s*(\d+)', re.IGNORECASE),
+    re.compile(r'Ref\.?:?\s*(\d+)'),
+)
+_SURVEYED_BY_RE = re.compile(r'Surveyed By:\s*([^\n]+)')
+_UPSTREAM_RE = re.compile(r'Upstream MH:\s*([\w\-]+)')
+_DOWNSTREAM_RE = re.compile(r'Downstream MH:\s*([\w\-]+)')
+_SHAPE_RE = re.compile(r'Pipe shape:\s*(\w+)')
+_SIZE_RE = re.compile(r'Pipe size:\s*([\d\s"]+?)(?:\s+Sewer Category:|\s+Purpose:|$)')
+_MATERIAL_RE = re.compile(r'Pipe material:\s*([^\n]+?)(?:\s+Purpose:|\s+Lining Method:|$)')
+_TOTAL_LENGTH_RE = re.compile(r'Total Length:\s*([\d.]+)\s*[\'"]')
+_STREET_RE = re.compile(r'Street:\s*([^\n]+)')
+_CITY_RE = re.compile(r'City:\s*([^\n]+)')
+_OBS_RE = re.compile(r'([\d.]+)\s+([A-Z]+)\s+([^\n]+?)\s+(\d{2}:\d{2}:\d{2})')
+
+# Ratings (label on one line, value on the next), found in a single pass.
+# Longer labels come first so SPR/MPR/OPR don't shadow SPRI/MPRI/OPRI. Group 2
+# is the full value, group 3 its leading digits (integer ratings stop there).
+_RATINGS_RE = re.compile(r'(QSR|QMR|QOR|SPRI|MPRI|OPRI|SPR|MPR|OPR)\s*:?\s*[\r\n]+\s*(?=[\d.])((\d*)[\d.]*)', re.IGNORECASE)
+_RATING_CAST = {
+    'qsr': int, 'qmr': int, 'qor': int,
+    'spr': float, 'mpr': float, 'spri': float, 'mpri': float, 'opri': float, 'opr': float,
+}
+_CONCAT_RATINGS_RE = re.compile(r'QSRQMR[^\n]*[\r\n]+\s*([\d.]+)', re.IGNORECASE)
+_QOR_STRICT_RE = re.compile(r'QOR[\r\n]+\s*(\d+)', re.IGNORECASE)
+# Any standalone rating label, whether or not a value follows on the next line
+_RATING_LABEL_RE = re.compile(r'\b(QSR|QMR|QOR|SPRI|MPRI|OPRI|SPR|MPR|OPR)\b', re.IGNORECASE)
+
 def extract_section_profile(text):
     """Extract Section Profile data from PDF text with vertical layout handling"""
-    psr_data = []
+    # Entries keyed by (PSR, upstream MH, downstream MH): duplicates are dropped
+    # on insertion and the dict keeps first-seen order
+    psr_data = {}
     
     # Find Section Profile section - grab EVERYTHING until "Inspection report"
     # This handles multi-page tables with repeated headers
-    section_match = re.search(r'Section Profile(.*?)(?=Inspection report|$)', text, re.DOTALL | re.IGNORECASE)
+    section_match = _SECTION_PROFILE_RE.search(text)
     
     if not section_match:
-        print("No Section Profile section found", file=sys.stderr)
-        return psr_data
+        _dbg("No Section Profile section found")
+        return []
     
     section = section_match.group(1)
-    print(f"Section Profile text length: {len(section)} chars", file=sys.stderr)
+    _dbg(f"Section Profile text length: {len(section)} chars")
+    
+    # Split once; the horizontal pass needs the original spacing, the vertical
+    # fallback strips these same lines
+    raw_lines = section.splitlines()
     
     # Try horizontal layout first (rows)
-    lines = section.split('\n')
     horizontal_matches = 0
+    horizontal_nos = set()
+    matched_line_indices = set()
     
-    for line in lines:
-        # Skip headers and empty lines
-        if not line.strip() or 'No.' in line or 'PSR' in line or 'Upstream' in line or 'Circular' in line or 'Surveyed' in line:
+    # Hot loop: bind lookups to locals once
+    match_row = _ROW_RE.match
+    add_entry = psr_data.setdefault
+    mark_matched = matched_line_indices.add
+    header_prefixes = _HEADER_PREFIXES
+    
+    for line_idx, line in enumerate(raw_lines):
+        # Skip headers and empty lines (data rows always start with the No. digits)
+        stripped = line.lstrip()
+        if not stripped or stripped.startswith(header_prefixes):
             continue
         
         # Pattern with proper spacing (normal table layout)
-        match = re.match(r'\s*(\d+)\s+(\d+)\s+([\d\-A-Z]+)\s+([\d\-A-Z]+)\s+(\d{1,2}/\d{1,2}/\d{4})\s+([A-Z]+)\s+([\d.]+)\s+([\d.]+)', line)
+        match = match_row(line)
         
         if match:
             horizontal_matches += 1
-            entry = {
-                'no': int(match.group(1)),  # Convert to int for proper sorting
-                'psr': int(match.group(2)),  # Convert to int for proper sorting
-                'upstreamMH': match.group(3),
-                'downstreamMH': match.group(4),
-                'date': match.group(5),
-                'material': match.group(6),
-                'totalLength': float(match.group(7)),
-                'lengthSurveyed': float(match.group(8))
-            }
-            psr_data.append(entry)
+            mark_matched(line_idx)
+            no, psr, upstream_mh, downstream_mh, date, material, total_length, length_surveyed = match.groups()
+            no_int = int(no)  # Convert to int for proper sorting
+            psr_int = int(psr)  # Convert to int for proper sorting
+            horizontal_nos.add(no_int)
+            add_entry((psr_int, upstream_mh, downstream_mh), {
+                'no': no_int,
+                'psr': psr_int,
+                'upstreamMH': upstream_mh,
+                'downstreamMH': downstream_mh,
+                'date': date,
+                'material': material,
+                'totalLength': float(total_length),
+                'lengthSurveyed': float(length_surveyed)
+            })
+    
+    # Lines the horizontal pass didn't consume, stripped and non-empty
+    if matched_line_indices:
+        remaining_lines = (line for line_idx, line in enumerate(raw_lines) if line_idx not in matched_line_indices)
+    else:
+        remaining_lines = raw_lines
+    lines = [line for line in map(str.strip, remaining_lines) if line]
+    
+    # Rows are numbered 1..N: if the horizontal rows cover every No. up to the
+    # highest one seen and nothing left over looks like a column of MH IDs, the
+    # table was fully read. Otherwise (nothing matched, or e.g. page 1 was
+    # row-based and later pages are column-based) run the vertical pass over
+    # the leftover lines only.
+    highest_no = max(horizontal_nos, default=0)
+    horizontal_complete = (
+        horizontal_matches > 0
+        and len(horizontal_nos) >= highest_no
+        and not any('-' in line and _MH_ID_RE.match(line) for line in lines)
+    )
     
-    # If horizontal didn't work, try vertical layout (column-based extraction)
-    if horizontal_matches == 0:
-        print("Trying vertical/column-based extraction...", file=sys.stderr)
+    vertical_entries = 0
+    if not horizontal_complete:
+        _dbg("Trying vertical/column-based extraction...")
         
         # Strategy: The PDF has a vertical layout where each column's values are listed top-to-bottom
         # We need to extract each column separately, handling repeated headers across pages
@@ -62,48 +178,61 @@ def extract_section_profile(text):
         # Find all individual numbers, MH IDs, dates, materials (in order as they appear)
         # Then match them up based on their positions
         
-        # Split section into lines to process sequentially  
-        lines = [line.strip() for line in section.split('\n') if line.strip()]
-        
         # Use state machine to track which column we're currently reading
         current_state = 'unknown'
         nos_temp = []
         psrs_temp = []
+        psrs_seen = set()  # Membership check for psrs_temp, which keeps order
         mh_ids_temp = []
         dates_temp = []
         materials_temp = []
-        lengths_temp = []
+        lengths_temp = array.array('d')  # Parsed once when classified
         
         # Simpler approach: collect all data by type, then match up based on MH ID count
         # PSR numbers typically appear just before MH IDs
         
-        for i, line in enumerate(lines):
-            # Skip headers and summary lines
-            if line in ['No.', 'PSR', 'Upstream MH', 'Downstream MH', 'Date', 'Material', 'Total Length', 'Length', 'Surveyed', 'Project', '2024 Sewerline Cleaning & CCTV- Hays_ KS', 'Section Profile']:
-                continue
-            if 'Circular' in line or 'Total Length (' in line:
-                continue
-            
-            # Classify by pattern
-            # MH ID pattern
-            if re.match(r'^\d{2,3}-\d{2}-\d{2}-\d{3}[A-Z]?$', line):
-                # Check if previous line was a number (likely PSR)
-                if i > 0 and re.match(r'^\d+$', lines[i-1]) and lines[i-1] not in ['No.', 'PSR']:
-                    psr_candidate = lines[i-1]
-                    if psr_candidate not in psrs_temp:  # Avoid duplicates
-                        psrs_temp.append(psr_candidate)
-                mh_ids_temp.append(line)
-            # Date pattern
-            elif re.match(r'^\d{1,2}/\d{1,2}/\d{4}$', line):
-                dates_temp.append(line)
+        # Classify each line with cheap character checks and only run the
+        # anchored regex to validate the bucket it lands in. Header and summary
+        # lines ('No.', 'Section Profile', 'Total Length (Circular)', ...) never
+        # start with a digit and are not materials, so they fall through.
+        # (A single named-group alternation per line, with stdlib re or RE2,
+        # measured slower than this dispatch on these short lines.)
+        match_date = _DATE_RE.match
+        match_mh_id = _MH_ID_RE.match
+        match_length = _LEN_RE.match
+        materials = _MATERIALS
+        add_date = dates_temp.append
+        intern = sys.intern  # Survey dates repeat across many rows
+        add_mh_id = mh_ids_temp.append
+        add_length = lengths_temp.append
+        add_material = materials_temp.append
+        prev_int = None  # Previous line if it was a bare integer (likely PSR)
+        for line in lines:
+            int_line = None
+            if line[0].isdigit():
+                # Date pattern
+                if '/' in line:
+                    if match_date(line):
+                        add_date(intern(line))
+                # MH ID pattern
+                elif '-' in line:
+                    if match_mh_id(line):
+                        if prev_int is not None and prev_int not in psrs_seen:  # Avoid duplicates
+                            psrs_seen.add(prev_int)
+                            psrs_temp.append(prev_int)
+                        add_mh_id(line)
+                # Length pattern
+                elif '.' in line:
+                    if match_length(line):
+                        add_length(float(line))
+                elif line.isdigit():
+                    int_line = line
             # Material pattern
-            elif line in ['VCP', 'PVC', 'RCP', 'CMP', 'DIP']:
-                materials_temp.append(line)
-            # Length pattern
-            elif re.match(r'^\d+\.\d{2}$', line):
-                lengths_temp.append(line)
+            elif line in materials:
+                add_material(line)
+            prev_int = int_line
         
-        print(f"Extracted: {len(nos_temp)} No., {len(psrs_temp)} PSR, {len(mh_ids_temp)} MH IDs, {len(dates_temp)} dates, {len(materials_temp)} materials, {len(lengths_temp)} lengths", file=sys.stderr)
+        _dbg(f"Extracted: {len(nos_temp)} No., {len(psrs_temp)} PSR, {len(mh_ids_temp)} MH IDs, {len(dates_temp)} dates, {len(materials_temp)} materials, {len(lengths_temp)} lengths")
         
         # Pair up MH IDs (upstream/downstream)
         mh_pairs = []
@@ -113,8 +242,9 @@ def extract_section_profile(text):
         # Now match everything up - each entry needs: No, PSR, MH pair, date, material, 2 lengths
         # Base count on MH pairs (most reliable), use PSRs where available, generate No. sequentially
         min_count = min(len(mh_pairs), len(dates_temp), len(materials_temp), len(lengths_temp) // 2)
+        vertical_entries = min_count
         
-        print(f"Building {min_count} entries (have {len(psrs_temp)} PSRs)...", file=sys.stderr)
+        _dbg(f"Building {min_count} entries (have {len(psrs_temp)} PSRs)...")
         
         for i in range(min_count):
             length_idx = i * 2
@@ -127,245 +257,336 @@ def extract_section_profile(text):
                 psr_int = 0
             
             entry = {
-                'no': i + 1,  # Generate sequential No. as integer
+                'no': highest_no + i + 1,  # Generate sequential No. (after any horizontal rows) as integer
                 'psr': psr_int,  # Store as integer for proper sorting
                 'upstreamMH': mh_pairs[i][0],
                 'downstreamMH': mh_pairs[i][1],
                 'date': dates_temp[i] if i < len(dates_temp) else '',
                 'material': materials_temp[i] if i < len(materials_temp) else '',
-                'totalLength': float(lengths_temp[length_idx]) if length_idx < len(lengths_temp) else 0.0,
-                'lengthSurveyed': float(lengths_temp[length_idx + 1]) if length_idx + 1 < len(lengths_temp) else 0.0
+                'totalLength': lengths_temp[length_idx] if length_idx < len(lengths_temp) else 0.0,
+                'lengthSurveyed': lengths_temp[length_idx + 1] if length_idx + 1 < len(lengths_temp) else 0.0
             }
-            psr_data.append(entry)
+            psr_data.setdefault((psr_int, entry['upstreamMH'], entry['downstreamMH']), entry)
             if i < 5:  # Show first 5
-                print(f"Extracted entry: No.{entry['no']}, PSR {entry['psr']}, {entry['upstreamMH']} → {entry['downstreamMH']}", file=sys.stderr)
-    
-    # Deduplicate entries (same PSR + MH combination)
-    seen = set()
-    unique_data = []
-    for entry in psr_data:
-        key = f"{entry['psr']}-{entry['upstreamMH']}-{entry['downstreamMH']}"
-        if key not in seen:
-            unique_data.append(entry)
-            seen.add(key)
-    
-    print(f"Total: {len(psr_data)} entries, {len(unique_data)} unique", file=sys.stderr)
+                _dbg(f"Extracted entry: No.{entry['no']}, PSR {entry['psr']}, {entry['upstreamMH']} → {entry['downstreamMH']}")
+    
+    unique_data = list(psr_data.values())
+    
+    _dbg(f"Total: {horizontal_matches + vertical_entries} entries, {len(unique_data)} unique")
     if unique_data:
-        print(f"PSR range: {unique_data[0]['psr']} to {unique_data[-1]['psr']}", file=sys.stderr)
+        _dbg(f"PSR range: {unique_data[0]['psr']} to {unique_data[-1]['psr']}")
     
     return unique_data
 
-def extract_inspection_reports(text):
-    """Extract Inspection Report data"""
-    reports = []
+def _report_spans(text):
+    """Yield (section_start, section_end, next_start, ratings_end) offsets into text
     
-    # Split by "Inspection report"
-    sections = re.split(r'Inspection report', text, flags=re.IGNORECASE)
+    A section runs from just past an "Inspection report" marker to the start
+    of the next marker (text before the first marker is skipped). Ratings also
+    look ahead into the next section, over text[next_start:ratings_end];
+    next_start is None for the last section.
+    """
+    markers = [(m.start(), m.end()) for m in _INSPECTION_SPLIT_RE.finditer(text)]
+    section_ends = [start for start, _ in markers[1:]] + [len(text)]
     
-    for i, section in enumerate(sections[1:], 1):  # Skip first (before first report)
-        report = {}
-        
-        # Extract fields
-        date_match = re.search(r'Date:\s*(\d{1,2}/\d{1,2}/\d{4})', section)
-        if date_match:
-            report['date'] = date_match.group(1)
-        
-        cert_match = re.search(r'Certificate Number:\s*([\w\-]+)', section)
-        if cert_match:
-            report['certificateNumber'] = cert_match.group(1)
-        
-        psr_match = re.search(r'Pipe\s+Segment\s+Ref\.?:?\s*(\d+)', section, re.IGNORECASE) or \
-                    re.search(r'PSR\s*:?\s*(\d+)', section, re.IGNORECASE) or \
-                    re.search(r'Ref\.?:?\s*(\d+)', section)
-        if psr_match:
-            report['psr'] = psr_match.group(1)
-        
-        surveyed_by_match = re.search(r'Surveyed By:\s*([^\n]+)', section)
-        if surveyed_by_match:
-            report['surveyedBy'] = surveyed_by_match.group(1).strip()
-        
-        upstream_match = re.search(r'Upstream MH:\s*([\w\-]+)', section)
-        if upstream_match:
-            report['upstreamMH'] = upstream_match.group(1)
-        
-        downstream_match = re.search(r'Downstream MH:\s*([\w\-]+)', section)
-        if downstream_match:
-            report['downstreamMH'] = downstream_match.group(1)
-        
-        shape_match = re.search(r'Pipe shape:\s*(\w+)', section)
-        if shape_match:
-            report['pipeShape'] = shape_match.group(1)
-        
-        size_match = re.search(r'Pipe size:\s*([\d\s"]+?)(?:\s+Sewer Category:|\s+Purpose:|$)', section)
-        if size_match:
-            report['pipeSize'] = size_match.group(1).strip()
-        
-        material_match = re.search(r'Pipe material:\s*([^\n]+?)(?:\s+Purpose:|\s+Lining Method:|$)', section)
-        if material_match:
-            report['pipeMaterial'] = material_match.group(1).strip()
-        
-        total_length_match = re.search(r'Total Length:\s*([\d.]+)\s*[\'"]', section)
-        if total_length_match:
-            report['totalLength'] = float(total_length_match.group(1))
-        
-        # Extract ratings - handle both proper format and concatenated format
-        # Also look ahead into the next section since ratings can spill over
-        ratings_section = section
-        if i < len(sections) - 1:
-            next_section = sections[i + 1]
+    for i, (_, section_start) in enumerate(markers):
+        section_end = section_ends[i]
+        
+        # Ratings can spill over into the next section, so look ahead into it
+        next_start = None
+        ratings_end = section_end
+        if i < len(markers) - 1:
+            next_start = markers[i + 1][1]
             # Include first 2000 chars of next section, but stop at "Section Pictures" or next page marker
-            end_idx = 2000
-            section_pictures_idx = next_section.find('Section Pictures')
-            page_marker_idx = next_section.find('// Page:')
+            next_end = section_ends[i + 1]
+            end_idx = next_start + 2000
+            # Markers only count if they start inside the 2000-char window
+            search_end = min(end_idx + len('Section Pictures'), next_end)
+            section_pictures_idx = text.find('Section Pictures', next_start, search_end)
+            page_marker_idx = text.find('// Page:', next_start, search_end)
             
             if section_pictures_idx != -1 and section_pictures_idx < end_idx:
                 end_idx = section_pictures_idx
             elif page_marker_idx != -1 and page_marker_idx < end_idx:
                 end_idx = page_marker_idx + 50
             
-            end_idx = min(end_idx, len(next_section))
-            ratings_section = section + '\n' + next_section[:end_idx]
-        
-        # Try proper format first (label on one line, value on next)
-        qsr_match = re.search(r'QSR\s*:?\s*[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
-        qmr_match = re.search(r'QMR\s*:?\s*[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
-        qor_match = re.search(r'QOR\s*:?\s*[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
-        spr_match = re.search(r'SPR\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-        mpr_match = re.search(r'MPR\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-        spri_match = re.search(r'SPRI\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-        mpri_match = re.search(r'MPRI\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-        opri_match = re.search(r'OPRI\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-        opr_match = re.search(r'OPR\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-        
-        used_concatenated_format = False
-        
-        # If proper format didn't work, try concatenated format
-        if not qsr_match:
-            # Look for pattern: QSRQMR... on one line, then all numbers on the next
-            concat_match = re.search(r'QSRQMR[^\n]*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-            if concat_match:
-                numbers_line = concat_match.group(1)
-                # Extract QSR (4 digits), QMR (4 digits), then decimal ratings
-                if len(numbers_line) >= 8:
-                    qsr_str = numbers_line[0:4]
-                    qmr_str = numbers_line[4:8]
-                    decimal_part = numbers_line[8:]
-                    
-                    # Extract all X.Y patterns (single digits only)
-                    decimals = re.findall(r'\d\.\d', decimal_part)
-                    
-                    if qsr_str.isdigit() and qmr_str.isdigit() and len(decimals) >= 6:
-                        report['qsr'] = int(qsr_str)
-                        report['qmr'] = int(qmr_str)
-                        # Corrected order based on visual layout: SPR, MPR, SPRI, MPRI, OPRI, OPR
-                        report['spr'] = float(decimals[0])
-                        report['mpr'] = float(decimals[1])
-                        report['spri'] = float(decimals[2])
-                        report['mpri'] = float(decimals[3])
-                        report['opri'] = float(decimals[4])
-                        report['opr'] = float(decimals[5])
-                        used_concatenated_format = True
-            
-            # QOR appears separately even in concatenated format
-            if not used_concatenated_format:
-                qor_match = re.search(r'QOR[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
-            else:
-                qor_match = re.search(r'QOR[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
+            ratings_end = min(end_idx, next_end)
         
-        # Apply matches from proper format only if we didn't use concatenated format
-        if not used_concatenated_format:
-            if qsr_match:
-                report['qsr'] = int(qsr_match.group(1))
-            if qmr_match:
-                report['qmr'] = int(qmr_match.group(1))
-            if qor_match:
-                report['qor'] = int(qor_match.group(1))
-            if spr_match:
-                report['spr'] = float(spr_match.group(1))
-            if mpr_match:
-                report['mpr'] = float(mpr_match.group(1))
-            if spri_match:
-                report['spri'] = float(spri_match.group(1))
-            if mpri_match:
-                report['mpri'] = float(mpri_match.group(1))
-            if opri_match:
-                report['opri'] = float(opri_match.group(1))
-            if opr_match:
-                report['opr'] = float(opr_match.group(1))
+        yield section_start, section_end, next_start, ratings_end
+
+def _parse_report(section, ratings_section):
+    """Parse one inspection report section
+    
+    ratings_section is the section plus a look-ahead into the next one, since
+    ratings can spill over. Returns (report, observation count).
+    """
+    report = {}
+    
+    # Extract fields
+    date_match = _DATE_FIELD_RE.search(section)
+    if date_match:
+        report['date'] = date_match.group(1)
+    
+    cert_match = _CERT_RE.search(section)
+    if cert_match:
+        report['certificateNumber'] = cert_match.group(1)
+    
+    psr_match = None
+    for psr_re in _PSR_RES:
+        psr_match = psr_re.search(section)
+        if psr_match:
+            break
+    if psr_match:
+        report['psr'] = psr_match.group(1)
+    
+    surveyed_by_match = _SURVEYED_BY_RE.search(section)
+    if surveyed_by_match:
+        report['surveyedBy'] = surveyed_by_match.group(1).strip()
+    
+    upstream_match = _UPSTREAM_RE.search(section)
+    if upstream_match:
+        report['upstreamMH'] = upstream_match.group(1)
+    
+    downstream_match = _DOWNSTREAM_RE.search(section)
+    if downstream_match:
+        report['downstreamMH'] = downstream_match.group(1)
+    
+    shape_match = _SHAPE_RE.search(section)
+    if shape_match:
+        report['pipeShape'] = shape_match.group(1)
+    
+    size_match = _SIZE_RE.search(section)
+    if size_match:
+        report['pipeSize'] = size_match.group(1).strip()
+    
+    material_match = _MATERIAL_RE.search(section)
+    if material_match:
+        report['pipeMaterial'] = material_match.group(1).strip()
+    
+    total_length_match = _TOTAL_LENGTH_RE.search(section)
+    if total_length_match:
+        report['totalLength'] = float(total_length_match.group(1))
+    
+    # Extract ratings - handle both proper format and concatenated format
+    # Try proper format first (label on one line, value on next)
+    # The first occurrence of each label wins, as with a per-label search
+    rating_matches = {}
+    for rating_match in _RATINGS_RE.finditer(ratings_section):
+        field = rating_match.group(1).lower()
+        if field in rating_matches:
+            continue
+        value = rating_match.group(3) if _RATING_CAST[field] is int else rating_match.group(2)
+        if value:
+            rating_matches[field] = value
+    
+    used_concatenated_format = False
+    
+    # If proper format didn't work, try concatenated format
+    if 'qsr' not in rating_matches:
+        # Look for pattern: QSRQMR... on one line, then all numbers on the next
+        concat_match = _CONCAT_RATINGS_RE.search(ratings_section)
+        if concat_match:
+            numbers_line = concat_match.group(1)
+            # Extract QSR (4 digits), QMR (4 digits), then decimal ratings
+            if len(numbers_line) >= 8:
+                qsr_str = numbers_line[0:4]
+                qmr_str = numbers_line[4:8]
+                decimal_part = numbers_line[8:]
+    
+                # Six fixed-width X.Y fields (single digits only), sliced by position
+                decimals = [decimal_part[j:j + 3] for j in range(0, min(len(decimal_part), 18), 3)]
+                decimals_valid = len(decimals) == 6 and all(
+                    len(d) == 3 and d[1] == '.' and d[0].isdigit() and d[2].isdigit() for d in decimals
+                )
+    
+                if qsr_str.isdigit() and qmr_str.isdigit() and decimals_valid:
+                    report['qsr'] = int(qsr_str)
+                    report['qmr'] = int(qmr_str)
+                    # Corrected order based on visual layout: SPR, MPR, SPRI, MPRI, OPRI, OPR
+                    report['spr'] = float(decimals[0])
+                    report['mpr'] = float(decimals[1])
+                    report['spri'] = float(decimals[2])
+                    report['mpri'] = float(decimals[3])
+                    report['opri'] = float(decimals[4])
+                    report['opr'] = float(decimals[5])
+                    used_concatenated_format = True
+    
+        # QOR appears separately even in concatenated format
+        qor_match = _QOR_STRICT_RE.search(ratings_section)
+        if qor_match:
+            rating_matches['qor'] = qor_match.group(1)
         else:
-            # Even in concatenated format, apply QOR since it appears separately
-            if qor_match:
-                report['qor'] = int(qor_match.group(1))
-        
-        street_match = re.search(r'Street:\s*([^\n]+)', section)
-        if street_match:
-            report['street'] = street_match.group(1).strip()
-        
-        city_match = re.search(r'City:\s*([^\n]+)', section)
-        if city_match:
-            report['city'] = city_match.group(1).strip()
-        
-        # Extract observations
-        observations = []
-        obs_pattern = r'([\d.]+)\s+([A-Z]+)\s+([^\n]+?)\s+(\d{2}:\d{2}:\d{2})'
-        for obs_match in re.finditer(obs_pattern, section):
-            observations.append({
-                'distance': float(obs_match.group(1)),
-                'code': obs_match.group(2),
-                'observation': obs_match.group(3).strip(),
-                'counter': obs_match.group(4)
-            })
-        
-        if observations:
-            report['observations'] = observations
+            rating_matches.pop('qor', None)
+    
+    # Apply matches from proper format only if we didn't use concatenated format
+    # (even in concatenated format QOR is applied, since it appears separately)
+    for field, value in rating_matches.items():
+        if used_concatenated_format and field != 'qor':
+            continue
+        report[field] = _RATING_CAST[field](value)
+    
+    street_match = _STREET_RE.search(section)
+    if street_match:
+        report['street'] = street_match.group(1).strip()
+    
+    city_match = _CITY_RE.search(section)
+    if city_match:
+        report['city'] = city_match.group(1).strip()
+    
+    # Extract observations
+    observations = [
+        {
+            'distance': float(distance),
+            'code': code,
+            'observation': observation.strip(),
+            'counter': counter
+        }
+        for distance, code, observation, counter in (m.groups() for m in _OBS_RE.finditer(section))
+    ]
+    
+    if observations:
+        report['observations'] = observations
+    
+    return report, len(observations)
+
+def extract_inspection_reports(text):
+    """Extract Inspection Report data
+    
+    Returns (reports, total_observations), the count being accumulated while
+    parsing so callers don't need a second pass over the reports.
+    """
+    reports = []
+    total_observations = 0
+    
+    for section_start, section_end, next_start, ratings_end in _report_spans(text):
+        section = text[section_start:section_end]
+        # The ratings view joins the look-ahead with a newline (leaving out the
+        # next report's marker), so a label ending the section still pairs with
+        # a value spilled into the next one
+        ratings_section = section
+        if next_start is not None:
+            ratings_section += '\n' + text[next_start:ratings_end]
         
+        report, observation_count = _parse_report(section, ratings_section)
         if report:  # Only add if we found something
             reports.append(report)
+            total_observations += observation_count
+    
+    return reports, total_observations
+
+def _ratings_readable(text):
+    """Check that every report has ratings and each rating label pairs with a value
     
-    return reports
+    The ratings are read as a label on one line and its value on the next.
+    PyMuPDF follows the drawing order rather than the page layout, so a ratings
+    grid drawn row by row comes out as all the labels followed by all the
+    values (pairing the last label with the first value and losing the rest),
+    and ratings drawn ahead of the report title land outside its section.
+    pdfminer's layout analysis keeps each label with its value and in place.
+    """
+    for section_start, section_end, next_start, ratings_end in _report_spans(text):
+        ratings_section = text[section_start:section_end]
+        if next_start is not None:
+            ratings_section += '\n' + text[next_start:ratings_end]
+        labels = {match.group(1).lower() for match in _RATING_LABEL_RE.finditer(ratings_section)}
+        if not labels or labels - {match.group(1).lower() for match in _RATINGS_RE.finditer(ratings_section)}:
+            return False
+    return True
+
+def extract_text_pymupdf(pdf_path):
+    """Extract plain text page by page with PyMuPDF"""
+    with pymupdf.open(pdf_path) as doc:
+        return '\n'.join(page.get_text('text') for page in doc)
+
+def extract_text_pdfminer(pdf_path, debug_output_path=None):
+    """Extract text with pdfminer's layout analysis
+    
+    When debug_output_path is given, the text is streamed straight into that
+    file and read back once, so only a single copy of it is held in memory.
+    """
+    # LAParams tuned for table extraction (wider margins to keep rows together)
+    laparams = LAParams(
+        line_margin=0.3,      # Tighter line grouping
+        word_margin=0.05,     # Smaller word gaps
+        char_margin=1.0,      # Tighter char grouping
+        boxes_flow=0.5,       # Try to maintain reading order
+        detect_vertical=False # Don't treat as vertical text
+    )
+    
+    debug_file = None
+    if debug_output_path:
+        try:
+            debug_file = open(debug_output_path, 'w', encoding='utf-8', newline='')
+        except OSError as e:
+            _dbg(f"Could not save debug text: {e}")
+    
+    if debug_file is None:
+        return extract_text(pdf_path, laparams=laparams)
+    
+    with debug_file, open(pdf_path, 'rb') as pdf_file:
+        extract_text_to_fp(pdf_file, debug_file, laparams=laparams)
+    with open(debug_output_path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    _dbg(f"Saved extracted text to: {debug_output_path}")
+    return text
 
 def main():
-    if len(sys.argv) < 2:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args:
         print(json.dumps({'success': False, 'error': 'No PDF file path provided'}))
         sys.exit(1)
     
-    pdf_path = sys.argv[1]
+    pdf_path = args[0]
+    strict_layout = '--strict-layout' in sys.argv
+    debug_output_path = os.path.splitext(pdf_path)[0] + '_extracted_text.txt' if _DEBUG else None
     
     try:
-        # Extract text with layout preservation
-        output_string = StringIO()
-        with open(pdf_path, 'rb') as pdf_file:
-            # LAParams tuned for table extraction (wider margins to keep rows together)
-            laparams = LAParams(
-                line_margin=0.3,      # Tighter line grouping
-                word_margin=0.05,     # Smaller word gaps
-                char_margin=1.0,      # Tighter char grouping
-                boxes_flow=0.5,       # Try to maintain reading order
-                detect_vertical=False # Don't treat as vertical text
-            )
-            extract_text_to_fp(pdf_file, output_string, laparams=laparams)
-        
-        text = output_string.getvalue()
-        
-        # Save raw extracted text to file for debugging
-        debug_output_path = pdf_path.replace('.pdf', '_extracted_text.txt')
-        try:
-            with open(debug_output_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            print(f"Saved extracted text to: {debug_output_path}", file=sys.stderr)
-        except Exception as e:
-            print(f"Could not save debug text: {e}", file=sys.stderr)
-        
-        # Debug: print first 500 chars to stderr
-        print(f"Extracted text length: {len(text)}", file=sys.stderr)
-        print(f"First 500 chars:\n{text[:500]}", file=sys.stderr)
+        text = None
+        if pymupdf is not None and not strict_layout:
+            try:
+                text = extract_text_pymupdf(pdf_path)
+            except Exception as e:
+                _dbg(f"PyMuPDF extraction failed, falling back to pdfminer: {e}")
+            if text is not None and len(text.strip()) < _MIN_TEXT_LENGTH:
+                _dbg("PyMuPDF found almost no text, falling back to pdfminer")
+                text = None
+            if text is not None and debug_output_path:
+                try:
+                    with open(debug_output_path, 'w', encoding='utf-8', newline='') as f:
+                        f.write(text)
+                    _dbg(f"Saved extracted text to: {debug_output_path}")
+                except OSError as e:
+                    _dbg(f"Could not save debug text: {e}")
+        
+        used_layout = text is None
+        if used_layout:
+            text = extract_text_pdfminer(pdf_path, debug_output_path)
+        
+        _dbg(f"Extracted text length: {len(text)}")
+        _dbg(f"First 500 chars:\n{text[:500]}")
         
         # Extract data
         section_profile = extract_section_profile(text)
-        inspection_reports = extract_inspection_reports(text)
         
-        print(f"Extracted {len(section_profile)} Section Profile entries", file=sys.stderr)
-        print(f"Extracted {len(inspection_reports)} Inspection Reports", file=sys.stderr)
+        # The fast (no layout analysis) text is enough for most PDFs; only pay
+        # for pdfminer's layout analysis when it didn't yield the table or a
+        # report's ratings. Both the table and the reports then come from the
+        # layout text, never a mix of the two
+        reextract = False
+        if not used_layout and len(section_profile) < _MIN_FAST_PATH_ENTRIES:
+            _dbg(f"Only {len(section_profile)} Section Profile entries from fast text, re-extracting with layout analysis")
+            reextract = True
+        elif not used_layout and not _ratings_readable(text):
+            _dbg("Missing or unpaired report ratings in fast text, re-extracting with layout analysis")
+            reextract = True
+        if reextract:
+            text = extract_text_pdfminer(pdf_path, debug_output_path)
+            section_profile = extract_section_profile(text)
+        
+        inspection_reports, total_observations = extract_inspection_reports(text)
+        
+        _dbg(f"Extracted {len(section_profile)} Section Profile entries")
+        _dbg(f"Extracted {len(inspection_reports)} Inspection Reports")
         
         # Output JSON
         result = {
@@ -376,12 +597,20 @@ def main():
                 'metadata': {
                     'totalPSREntries': len(section_profile),
                     'totalInspectionReports': len(inspection_reports),
-                    'totalObservations': sum(len(r.get('observations', [])) for r in inspection_reports)
+                    'totalObservations': total_observations
                 }
             }
         }
         
-        print(json.dumps(result, indent=2))
+        # Compact separators by default; the indented encoder is slower and
+        # roughly triples the output size. Output stays ASCII-escaped: the Node
+        # reader decodes each stdout chunk separately, which would split
+        # multi-byte UTF-8 characters at chunk boundaries
+        if '--pretty' in sys.argv:
+            output = json.dumps(result, indent=2)
+        else:
+            output = json.dumps(result, separators=(',', ':'))
+        print(output)
         
     except Exception as e:
         print(json.dumps({'success': False, 'error': str(e)}))
@@ -4,10 +4,160 @@ PDF Parser using Camelot for table extraction
 Camelot is specifically designed for extracting tables from PDFs
 """
 
+import os
 import sys
 import json
 import re
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 import camelot
+import pandas as pd
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTContainer, LTText, LTTextBox
+from pdfminer.pdfpage import PDFPage
+
+# Diagnostics on stderr are opt-in (the summary counts and errors always print)
+_DEBUG = bool(os.environ.get('PDFPARSER_DEBUG'))
+
+def _dbg(*args):
+    """Print a diagnostic line to stderr, only in debug mode"""
+    if _DEBUG:
+        print(*args, file=sys.stderr)
+
+# Patterns are compiled once at import time rather than per report / per row
+
+# Section Profile: MH ID (e.g. "138-33-20-097")
+_SECTION_PROFILE_RE = re.compile(r'Section Profile', re.IGNORECASE)
+_MH_ID_RE = re.compile(r'\d{3}-\d{2}-\d{2}-\d{3}')
+# Integer cell values ('12', '+3'); rules out floats like '1.0' before to_numeric
+_INT_PATTERN = r'[+-]?\d+'
+# Cell text meaning "no value" (Camelot can emit a literal 'nan')
+_NAN_STRINGS = frozenset({'', 'nan'})
+# Section Profile table columns, in order
+_SECTION_COLUMNS = ['no', 'psr', 'upstreamMH', 'downstreamMH', 'date', 'material', 'totalLength', 'lengthSurveyed']
+
+# Inspection reports
+_INSPECTION_SPLIT_RE = re.compile(r'Inspection report', re.IGNORECASE)
+_PSR_RE = re.compile(r'Pipe\s+Segment\s+Ref\.?:?\s*(\d+)', re.IGNORECASE)
+_PSR_FALLBACK_RE = re.compile(r'PSR\s*:?\s*(\d+)', re.IGNORECASE)
+_DATE_RE = re.compile(r'Date:\s*(\d{1,2}/\d{1,2}/\d{4})')
+_SURVEYED_BY_RE = re.compile(r'Surveyed\s+By:\s*([^\n]+)', re.IGNORECASE)
+_CERT_RE = re.compile(r'Certificate\s+Number:\s*([^\n]+)', re.IGNORECASE)
+_PRE_CLEANING_RE = re.compile(r'Pre-cleaning:\s*([^\n]+)', re.IGNORECASE)
+_PIPE_CLEANING_RE = re.compile(r'Pipe\s+[Cc]leaning:\s*([^\n]+)', re.IGNORECASE)
+_DIRECTION_RE = re.compile(r'Direction:\s*([^\n]+)', re.IGNORECASE)
+_TOTAL_LENGTH_RE = re.compile(r'Total\s+Length:\s*([\d.]+)', re.IGNORECASE)
+_LENGTH_SURVEYED_RE = re.compile(r'Length\s+Surveyed:\s*([\d.]+)', re.IGNORECASE)
+_UPSTREAM_RE = re.compile(r'Upstream\s+MH:\s*([\w\-]+)', re.IGNORECASE)
+_DOWNSTREAM_RE = re.compile(r'Downstream\s+MH:\s*([\w\-]+)', re.IGNORECASE)
+_MEDIA_LABEL_RE = re.compile(r'\s+Media Label:.*$')
+_SHAPE_RE = re.compile(r'Pipe\s+shape:\s*(\w+)', re.IGNORECASE)
+_SIZE_RE = re.compile(r'Pipe\s+size:\s*([\d\s"]+?)(?:\s+Sewer Category:|\s+Purpose:|$)', re.IGNORECASE)
+_MATERIAL_RE = re.compile(r'Pipe\s+material:\s*([^\n]+?)(?:\s+Purpose:|\s+Lining Method:|$)', re.IGNORECASE)
+
+# Ratings (label on one line, value on the next), found in a single pass.
+# Longer labels come first so SPR/MPR/OPR don't shadow SPRI/MPRI/OPRI. Group 2
+# is the full value, group 3 its leading digits (integer ratings stop there).
+_RATINGS_RE = re.compile(r'(QSR|QMR|QOR|SPRI|MPRI|OPRI|SPR|MPR|OPR)\s*:?\s*[\r\n]+\s*(?=[\d.])((\d*)[\d.]*)', re.IGNORECASE)
+_RATING_CAST = {
+    'qsr': int, 'qmr': int, 'qor': int,
+    'spr': float, 'mpr': float, 'spri': float, 'mpri': float, 'opri': float, 'opr': float,
+}
+# Concatenated format: "QSRQMR..." on one line, all numbers on the next
+_CONCAT_RATINGS_RE = re.compile(r'QSRQMR[^\n]*[\r\n]+\s*([\d.]+)', re.IGNORECASE)
+_DECIMAL_RE = re.compile(r'\d\.\d')
+_QOR_STRICT_RE = re.compile(r'QOR[\r\n]+\s*(\d+)', re.IGNORECASE)
+
+def _find_section_tables(tables):
+    """Yield (index, table) for every Section Profile table among Camelot's tables"""
+    for idx, table in enumerate(tables):
+        df = table.df
+        
+        # Check if this is the Section Profile table
+        # Look for 8-column tables with MH ID patterns (e.g., "138-33-20-097")
+        if df.shape[1] == 8 and df.shape[0] > 10:  # Exactly 8 columns and more than 10 rows
+            _dbg(f"\nCandidate table {idx}: shape {df.shape}, page {table.page}")
+            # Check if first few rows contain MH ID patterns (format: XXX-XX-XX-XXX),
+            # casting the 5x8 head in one go rather than row by row
+            head_text = ' '.join(df.head(5).to_numpy(dtype=str, na_value='').ravel().tolist())
+            if _MH_ID_RE.search(head_text):
+                yield idx, table
+
+def _section_table_entries(rows):
+    """Validate and convert Section Profile table rows into entry dicts
+    
+    Works column by column on the DataFrame instead of row by row. Rows that
+    are empty, summaries ('Circular ...'), or fail validation are dropped.
+    """
+    # Normalize every cell once: missing cells become '', the rest stripped str
+    fields = rows.fillna('').astype(str).apply(lambda col: col.str.strip())
+    fields.columns = _SECTION_COLUMNS
+    
+    # Skip empty or summary rows. The 'Circular' summary label sits in the
+    # first two columns (or column 0 when crammed), so only those are searched
+    is_summary = (
+        fields['no'].str.lower().str.contains('circular', regex=False)
+        | fields['psr'].str.lower().str.contains('circular', regex=False)
+    )
+    fields = fields[~is_summary & fields.ne('').any(axis=1)]
+    
+    # If column 0 has newlines and column 1 is empty, all data is crammed in
+    # column 0: split it on newlines (rows with fewer than 8 parts are dropped)
+    crammed = fields['no'].str.contains('\n', regex=False) & fields['psr'].eq('')
+    if crammed.any():
+        parts = fields.loc[crammed, 'no'].str.split('\n')
+        enough = parts.str.len() >= 8
+        parts = parts[enough]
+        fields = fields.drop(enough.index[~enough])
+        split = pd.DataFrame(parts.str[:8].tolist(), index=parts.index, columns=_SECTION_COLUMNS)
+        fields.loc[parts.index] = split.apply(lambda col: col.str.strip())
+    
+    # Validate that we have required fields
+    # Check: MH IDs have dashes (which also rules out 'nan'), no and psr are
+    # integers. Rejected rows mostly fail on the MH IDs, so that cheap check
+    # runs first and only the rows passing it have their numbers parsed
+    fields = fields[
+        fields['upstreamMH'].str.contains('-', regex=False)
+        & fields['downstreamMH'].str.contains('-', regex=False)
+    ]
+    nos = pd.to_numeric(fields['no'].where(fields['no'].str.fullmatch(_INT_PATTERN)), errors='coerce')
+    psrs = pd.to_numeric(fields['psr'].where(fields['psr'].str.fullmatch(_INT_PATTERN)), errors='coerce')
+    valid = nos.notna() & psrs.notna()
+    
+    # Lengths: empty or 'nan' means 0.0, anything else must parse as a number
+    lengths = {}
+    for column in ('totalLength', 'lengthSurveyed'):
+        blank = fields[column].isin(_NAN_STRINGS)
+        values = pd.to_numeric(fields[column].where(~blank), errors='coerce')
+        valid &= blank | values.notna()
+        lengths[column] = values.fillna(0.0).astype(float)
+    
+    # Build the entries from whole-column lists (no and psr stored as integers
+    # for proper sorting)
+    entries = fields[valid]
+    return [
+        {
+            'no': no,
+            'psr': psr,
+            'upstreamMH': upstream_mh,
+            'downstreamMH': downstream_mh,
+            'date': date,
+            'material': material,
+            'totalLength': total_length,
+            'lengthSurveyed': length_surveyed
+        }
+        for no, psr, upstream_mh, downstream_mh, date, material, total_length, length_surveyed in zip(
+            nos[valid].astype(int).tolist(),
+            psrs[valid].astype(int).tolist(),
+            entries['upstreamMH'].tolist(),
+            entries['downstreamMH'].tolist(),
+            entries['date'].tolist(),
+            entries['material'].tolist(),
+            lengths['totalLength'][valid].tolist(),
+            lengths['lengthSurveyed'][valid].tolist()
+        )
+    ]
 
 def extract_section_profile_with_camelot(pdf_path, pages='1-10'):
     """Extract Section Profile table using Camelot
@@ -18,148 +168,65 @@ def extract_section_profile_with_camelot(pdf_path, pages='1-10'):
     """
     psr_data = []
     
-    print(f"Extracting tables with Camelot from pages {pages}...", file=sys.stderr)
+    _dbg(f"Extracting tables with Camelot from pages {pages}...")
     
     try:
-        # Try both flavors to find tables
-        # flavor='lattice' for tables with borders, 'stream' for tables without borders
-        print("Trying Camelot with 'lattice' flavor...", file=sys.stderr)
-        tables_lattice = camelot.read_pdf(pdf_path, pages=pages, flavor='lattice')
-        print(f"Lattice found {len(tables_lattice)} tables", file=sys.stderr)
+        # flavor='lattice' for tables with borders, 'stream' for tables without borders.
+        # Each read_pdf call re-parses the pages, so stream only runs when
+        # lattice didn't produce the Section Profile table. The first matching
+        # table decides; the rest are checked lazily as they're parsed below
+        _dbg("Trying Camelot with 'lattice' flavor...")
+        tables = camelot.read_pdf(pdf_path, pages=pages, flavor='lattice')
+        _dbg(f"Lattice found {len(tables)} tables")
+        flavor_used = 'lattice'
+        section_tables = _find_section_tables(tables)
+        first_table = next(section_tables, None)
         
-        print("Trying Camelot with 'stream' flavor...", file=sys.stderr)
-        tables_stream = camelot.read_pdf(pdf_path, pages=pages, flavor='stream')
-        print(f"Stream found {len(tables_stream)} tables", file=sys.stderr)
+        if first_table is None:
+            _dbg("Trying Camelot with 'stream' flavor...")
+            tables = camelot.read_pdf(pdf_path, pages=pages, flavor='stream')
+            _dbg(f"Stream found {len(tables)} tables")
+            flavor_used = 'stream'
+            section_tables = _find_section_tables(tables)
+            first_table = next(section_tables, None)
         
-        # Use whichever found more tables
-        tables = tables_lattice if len(tables_lattice) > len(tables_stream) else tables_stream
-        flavor_used = 'lattice' if len(tables_lattice) > len(tables_stream) else 'stream'
+        _dbg(f"Using '{flavor_used}' flavor with {len(tables)} tables")
         
-        print(f"Using '{flavor_used}' flavor with {len(tables)} tables", file=sys.stderr)
-        
-        # Look for the Section Profile table
-        for idx, table in enumerate(tables):
+        # A multi-page Section Profile comes back as one table per page
+        if first_table is not None:
+            section_tables = chain((first_table,), section_tables)
+        for idx, table in section_tables:
             df = table.df
             
-            # Check if this is the Section Profile table
-            # Look for 8-column tables with MH ID patterns (e.g., "138-33-20-097")
-            if df.shape[1] == 8 and df.shape[0] > 10:  # Exactly 8 columns and more than 10 rows
-                print(f"\nCandidate table {idx}: shape {df.shape}, page {table.page}", file=sys.stderr)
-                # Check if first few rows contain MH ID patterns (format: XXX-XX-XX-XXX)
-                has_mh_pattern = False
-                for i in range(min(5, len(df))):
-                    row_text = ' '.join(df.iloc[i].astype(str).tolist())
-                    # Look for MH ID pattern: numbers with dashes
-                    if re.search(r'\d{3}-\d{2}-\d{2}-\d{3}', row_text):
-                        has_mh_pattern = True
-                        break
-                
-                if has_mh_pattern:
-                    print(f"✓ Found Section Profile table at index {idx}", file=sys.stderr)
-                    print(f"  Table shape: {df.shape}", file=sys.stderr)
-                    
-                    # Parse the table - start from row 0 since there's no header row
-                    # (Camelot already skipped the header)
-                    start_row = 0
-                    entries_before = len(psr_data)
-                    
-                    # Check if first row looks like a header
-                    first_row_text = ' '.join(df.iloc[0].astype(str).tolist()).lower()
-                    if 'no.' in first_row_text or 'upstream' in first_row_text or 'psr' in first_row_text:
-                        start_row = 1
-                        print(f"  Skipping header row", file=sys.stderr)
-                    
-                    # DEBUG: Show first data row structure
-                    if start_row < len(df):
-                        sample_row = df.iloc[start_row]
-                        print(f"  Sample row {start_row}: {list(sample_row)}", file=sys.stderr)
-                    
-                    # Extract data rows
-                    for i in range(start_row, len(df)):
-                        row = df.iloc[i]
-                        
-                        # Skip empty or summary rows
-                        row_text = ' '.join(row.astype(str).tolist())
-                        if 'circular' in row_text.lower() or not row_text.strip():
-                            continue
-                        
-                        # Try to extract fields (order: No, PSR, Upstream MH, Downstream MH, Date, Material, Total Length, Length Surveyed)
-                        try:
-                            if len(row) >= 8:
-                                # Check if all data is crammed in column 0 with newlines
-                                col0 = str(row.iloc[0]).strip()
-                                col1 = str(row.iloc[1]).strip()
-                                
-                                # If column 0 has newlines and other columns are empty, split on newlines
-                                if '\n' in col0 and (not col1 or col1 == ''):
-                                    parts = col0.split('\n')
-                                    if len(parts) >= 8:
-                                        no = parts[0].strip()
-                                        psr = parts[1].strip()
-                                        upstream_mh = parts[2].strip()
-                                        downstream_mh = parts[3].strip()
-                                        date = parts[4].strip()
-                                        material = parts[5].strip()
-                                        total_length = parts[6].strip()
-                                        length_surveyed = parts[7].strip()
-                                    else:
-                                        continue
-                                else:
-                                    # Normal case: each column has its own data
-                                    no = col0
-                                    psr = col1
-                                    upstream_mh = str(row.iloc[2]).strip()
-                                    downstream_mh = str(row.iloc[3]).strip()
-                                    date = str(row.iloc[4]).strip()
-                                    material = str(row.iloc[5]).strip()
-                                    total_length = str(row.iloc[6]).strip()
-                                    length_surveyed = str(row.iloc[7]).strip()
-                                
-                                # DEBUG: Show first row validation
-                                if i == start_row:
-                                    print(f"  First row values: no={no}, psr={psr}, up={upstream_mh}, down={downstream_mh}", file=sys.stderr)
-                                
-                                # Validate that we have required fields
-                                # Check: no and psr are numbers, MH IDs have dashes, not 'nan'
-                                if (no and no != 'nan' and psr and psr != 'nan' and 
-                                    '-' in upstream_mh and '-' in downstream_mh and
-                                    upstream_mh != 'nan' and downstream_mh != 'nan'):
-                                    
-                                    # Convert no and psr to integers for proper sorting
-                                    try:
-                                        no_int = int(no)
-                                        psr_int = int(psr)
-                                    except ValueError:
-                                        # Skip if not valid integers
-                                        continue
-                                    
-                                    entry = {
-                                        'no': no_int,  # Store as integer
-                                        'psr': psr_int,  # Store as integer
-                                        'upstreamMH': upstream_mh,
-                                        'downstreamMH': downstream_mh,
-                                        'date': date,
-                                        'material': material,
-                                        'totalLength': float(total_length) if total_length and total_length != 'nan' else 0.0,
-                                        'lengthSurveyed': float(length_surveyed) if length_surveyed and length_surveyed != 'nan' else 0.0
-                                    }
-                                    psr_data.append(entry)
-                                    
-                                    # Log first entry from this table
-                                    if i == start_row:
-                                        print(f"  ✓ First entry valid: No.{entry['no']}, PSR {entry['psr']}", file=sys.stderr)
-                                elif i == start_row:
-                                    print(f"  ✗ First row failed validation", file=sys.stderr)
-                        except (ValueError, IndexError) as e:
-                            # Skip rows that don't parse correctly
-                            if i == start_row:
-                                print(f"  ✗ Error parsing first row: {e}", file=sys.stderr)
-                            continue
-                    
-                    # Show how many entries were extracted from this table
-                    entries_added = len(psr_data) - entries_before
-                    print(f"  Extracted {entries_added} entries from this table", file=sys.stderr)
-        
+            _dbg(f"✓ Found Section Profile table at index {idx}")
+            _dbg(f"  Table shape: {df.shape}")
+            
+            # Parse the table - start from row 0 since there's no header row
+            # (Camelot already skipped the header)
+            start_row = 0
+            entries_before = len(psr_data)
+            
+            # Check if first row looks like a header
+            first_row_text = ' '.join(df.iloc[0].astype(str).tolist()).lower()
+            if 'no.' in first_row_text or 'upstream' in first_row_text or 'psr' in first_row_text:
+                start_row = 1
+                _dbg(f"  Skipping header row")
+            
+            # DEBUG: Show first data row structure
+            if _DEBUG and start_row < len(df):
+                sample_row = df.iloc[start_row]
+                _dbg(f"  Sample row {start_row}: {list(sample_row)}")
+            
+            # Extract data rows
+            entries = _section_table_entries(df.iloc[start_row:])
+            if _DEBUG and entries:
+                _dbg(f"  ✓ First entry valid: No.{entries[0]['no']}, PSR {entries[0]['psr']}")
+            psr_data.extend(entries)
+            
+            # Show how many entries were extracted from this table
+            entries_added = len(psr_data) - entries_before
+            _dbg(f"  Extracted {entries_added} entries from this table")
+
         print(f"Total extracted: {len(psr_data)} Section Profile entries", file=sys.stderr)
         
     except Exception as e:
@@ -167,82 +234,180 @@ def extract_section_profile_with_camelot(pdf_path, pages='1-10'):
     
     return psr_data
 
-def extract_inspection_reports_text(pdf_path):
-    """Extract inspection reports using text-based parsing (fallback to pdfminer)"""
-    from pdfminer.high_level import extract_text
+def _render_text(item, parts):
+    """Append a layout item's text to parts the way pdfminer's TextConverter writes it"""
+    if isinstance(item, LTTextBox):
+        parts.append(item.get_text())
+        parts.append('\n')
+    elif isinstance(item, LTContainer):
+        # Pages and figures (form XObjects) can hold text too
+        for child in item:
+            _render_text(child, parts)
+    elif isinstance(item, LTText):
+        parts.append(item.get_text())
+
+def extract_text_by_page(pdf_file, page_numbers=None):
+    """Extract text with pdfminer one page at a time, returning a list of page texts
+    
+    Each page's text matches what extract_text writes for it (text boxes
+    followed by a blank line, text inside figures included, '\\f' at the end).
     
+    Args:
+        pdf_file: Path to PDF file, or a binary file object with its contents
+        page_numbers: Zero-based page indexes to extract (default: all pages)
+    """
+    # Tighter grouping than the defaults, which is less layout work per page
+    laparams = LAParams(
+        line_margin=0.3,
+        char_margin=1.0,
+        word_margin=0.1,
+        detect_vertical=False,
+        all_texts=False
+    )
+    
+    page_texts = []
+    for page_layout in extract_pages(pdf_file, page_numbers=page_numbers, laparams=laparams):
+        parts = []
+        _render_text(page_layout, parts)
+        parts.append('\f')
+        page_texts.append(''.join(parts))
+    
+    return page_texts
+
+def _page_numbers(pages, page_count):
+    """Expand a Camelot page string ('1-10', '3,5-end', 'all') into page numbers"""
+    if pages == 'all':
+        return range(1, page_count + 1)
+    
+    numbers = []
+    for part in pages.split(','):
+        first, _, last = part.strip().partition('-')
+        last = page_count if last == 'end' else int(last or first)
+        numbers.extend(range(int(first), min(last, page_count) + 1))
+    return numbers
+
+def _read_page_texts(pdf_bytes, page_nos):
+    """Extract {page number: text} for the given ascending 1-based page numbers
+    
+    Returns {} (after reporting the error) if pdfminer can't read the pages.
+    """
+    if not page_nos:  # pdfminer treats an empty page list as "all pages"
+        return {}
+    try:
+        page_texts = extract_text_by_page(BytesIO(pdf_bytes), [page_no - 1 for page_no in page_nos])
+    except Exception as e:
+        print(f"Error extracting text: {e}", file=sys.stderr)
+        return {}
+    return dict(zip(page_nos, page_texts))
+
+def find_section_profile_pages(page_texts, pages='1-10'):
+    """Narrow a Camelot page string to the pages holding the Section Profile table
+    
+    page_texts maps page numbers to text for the pages in pages. The table
+    starts at the 'Section Profile' heading and runs until the first
+    inspection report; pages in that stretch with MH IDs are kept. Returns
+    pages unchanged if nothing matches.
+    """
+    found = []
+    in_table = False
+    for page_no, page_text in sorted(page_texts.items()):
+        start = 0
+        if not in_table:
+            heading_match = _SECTION_PROFILE_RE.search(page_text)
+            if not heading_match:
+                continue
+            in_table = True
+            start = heading_match.end()
+        
+        report_match = _INSPECTION_SPLIT_RE.search(page_text, start)
+        end = report_match.start() if report_match else len(page_text)
+        if _MH_ID_RE.search(page_text, start, end):
+            found.append(page_no)
+        if report_match:
+            break
+    
+    return ','.join(map(str, found)) if found else pages
+
+def extract_inspection_reports_text(page_texts):
+    """Extract inspection reports using text-based parsing
+    
+    Args:
+        page_texts: Per-page text from extract_text_by_page
+    """
     reports = []
     
     try:
-        text = extract_text(pdf_path)
+        text = ''.join(page_texts)
         
-        # Split by "Inspection report"
-        sections = re.split(r'Inspection report', text, flags=re.IGNORECASE)
+        # Record section boundaries as offsets rather than splitting: each
+        # section runs from just past an "Inspection report" marker to the
+        # start of the next one, and is searched in place via pos/endpos
+        markers = [(m.start(), m.end()) for m in _INSPECTION_SPLIT_RE.finditer(text)]
+        section_ends = [marker_start for marker_start, _ in markers[1:]] + [len(text)]
         
-        for i, section in enumerate(sections[1:], 1):
+        for i, (_, start) in enumerate(markers):
+            end = section_ends[i]
             report = {}
             
             # Extract PSR (Pipe Segment Ref)
-            psr_match = re.search(r'Pipe\s+Segment\s+Ref\.?:?\s*(\d+)', section, re.IGNORECASE) or \
-                        re.search(r'PSR\s*:?\s*(\d+)', section, re.IGNORECASE)
+            psr_match = _PSR_RE.search(text, start, end) or _PSR_FALLBACK_RE.search(text, start, end)
             if psr_match:
                 report['psr'] = psr_match.group(1)  # Keep as string for consistency
             
             # Extract Date
-            date_match = re.search(r'Date:\s*(\d{1,2}/\d{1,2}/\d{4})', section)
+            date_match = _DATE_RE.search(text, start, end)
             if date_match:
                 report['date'] = date_match.group(1)
             
             # Extract Surveyed By
-            surveyed_match = re.search(r'Surveyed\s+By:\s*([^\n]+)', section, re.IGNORECASE)
+            surveyed_match = _SURVEYED_BY_RE.search(text, start, end)
             if surveyed_match:
                 report['surveyedBy'] = surveyed_match.group(1).strip()
             
             # Extract Certificate Number
-            cert_match = re.search(r'Certificate\s+Number:\s*([^\n]+)', section, re.IGNORECASE)
+            cert_match = _CERT_RE.search(text, start, end)
             if cert_match:
                 report['certificateNumber'] = cert_match.group(1).strip()
             
             # Extract Pre-cleaning / Pipe Cleaning
-            cleaning_match = re.search(r'Pre-cleaning:\s*([^\n]+)', section, re.IGNORECASE) or \
-                            re.search(r'Pipe\s+[Cc]leaning:\s*([^\n]+)', section, re.IGNORECASE)
+            cleaning_match = _PRE_CLEANING_RE.search(text, start, end) or _PIPE_CLEANING_RE.search(text, start, end)
             if cleaning_match:
                 report['pipeCleaning'] = cleaning_match.group(1).strip()
             
             # Extract Direction
-            direction_match = re.search(r'Direction:\s*([^\n]+)', section, re.IGNORECASE)
+            direction_match = _DIRECTION_RE.search(text, start, end)
             if direction_match:
                 report['direction'] = direction_match.group(1).strip()
             
             # Extract Total Length
-            total_length_match = re.search(r'Total\s+Length:\s*([\d.]+)', section, re.IGNORECASE)
+            total_length_match = _TOTAL_LENGTH_RE.search(text, start, end)
             if total_length_match:
                 report['totalLength'] = float(total_length_match.group(1))
             
             # Extract Length Surveyed
-            surveyed_length_match = re.search(r'Length\s+Surveyed:\s*([\d.]+)', section, re.IGNORECASE)
+            surveyed_length_match = _LENGTH_SURVEYED_RE.search(text, start, end)
             if surveyed_length_match:
                 report['lengthSurveyed'] = float(surveyed_length_match.group(1))
             
             # Extract Upstream MH
-            upstream_match = re.search(r'Upstream\s+MH:\s*([\w\-]+)', section, re.IGNORECASE)
+            upstream_match = _UPSTREAM_RE.search(text, start, end)
             if upstream_match:
                 report['upstreamMH'] = upstream_match.group(1)
             
             # Extract Downstream MH
-            downstream_match = re.search(r'Downstream\s+MH:\s*([\w\-]+)', section, re.IGNORECASE)
+            downstream_match = _DOWNSTREAM_RE.search(text, start, end)
             if downstream_match:
                 report['downstreamMH'] = downstream_match.group(1)
             
             # Extract City from Location Code (City field is empty, value is in Location Code)
             # Pattern: Location Code:\n\nHays, KS\n
             # We need to find the line after "Location Code:" that contains the city name
-            location_code_idx = section.find('Location Code:')
+            location_code_idx = text.find('Location Code:', start, end)
             if location_code_idx != -1:
                 # Get text after "Location Code:"
-                after_location_code = section[location_code_idx + len('Location Code:'):]
+                after_location_code = text[location_code_idx + len('Location Code:'):end]
                 # Split by newlines and find first non-empty line that's not "Location Details:"
-                lines = after_location_code.split('\n')
+                lines = after_location_code.split('\n', 5)
                 for line in lines[:5]:  # Check first 5 lines after Location Code
                     line = line.strip()
                     if line and line != 'Location Details:' and not line.startswith('Sheet'):
@@ -257,71 +422,75 @@ def extract_inspection_reports_text(pdf_path):
             
             # Extract Street from Drainage Area (Street field is empty, value is in Drainage Area)
             # Pattern: Drainage Area:\n\nHall & Canal, 32nd & 33rd Media Label:\n
-            drainage_area_idx = section.find('Drainage Area:')
+            drainage_area_idx = text.find('Drainage Area:', start, end)
             if drainage_area_idx != -1:
                 # Get text after "Drainage Area:"
-                after_drainage = section[drainage_area_idx + len('Drainage Area:'):]
+                after_drainage = text[drainage_area_idx + len('Drainage Area:'):end]
                 # Find the line that contains street info (before "Media Label:" or "Upstream MH:")
-                lines = after_drainage.split('\n')
+                lines = after_drainage.split('\n', 5)
                 for line in lines[:5]:  # Check first 5 lines after Drainage Area
                     line = line.strip()
                     if line and 'Media Label:' not in line and 'Upstream MH:' not in line:
                         # Remove "Media Label:" suffix if present
-                        line = re.sub(r'\s+Media Label:.*$', '', line).strip()
+                        line = _MEDIA_LABEL_RE.sub('', line).strip()
                         if line and line != 'Location Details:':
                             report['street'] = line
                             break
             
             # Extract Pipe Shape
-            shape_match = re.search(r'Pipe\s+shape:\s*(\w+)', section, re.IGNORECASE)
+            shape_match = _SHAPE_RE.search(text, start, end)
             if shape_match:
                 report['pipeShape'] = shape_match.group(1)
             
             # Extract Pipe Size
-            size_match = re.search(r'Pipe\s+size:\s*([\d\s"]+?)(?:\s+Sewer Category:|\s+Purpose:|$)', section, re.IGNORECASE)
+            size_match = _SIZE_RE.search(text, start, end)
             if size_match:
                 report['pipeSize'] = size_match.group(1).strip()
             
             # Extract Pipe Material
-            material_match = re.search(r'Pipe\s+material:\s*([^\n]+?)(?:\s+Purpose:|\s+Lining Method:|$)', section, re.IGNORECASE)
+            material_match = _MATERIAL_RE.search(text, start, end)
             if material_match:
                 report['pipeMaterial'] = material_match.group(1).strip()
             
             # Extract ratings - handle both proper format and concatenated format
             # Also look ahead into the next section since ratings can spill over
-            ratings_section = section
-            if i < len(sections) - 1:
-                next_section = sections[i + 1]
+            ratings_section = text[start:end]
+            if i < len(markers) - 1:
+                next_start = markers[i + 1][1]
+                next_end = section_ends[i + 1]
                 # Include first 2000 chars of next section, but stop at "Section Pictures" or next page marker
-                end_idx = 2000
-                section_pictures_idx = next_section.find('Section Pictures')
-                page_marker_idx = next_section.find('// Page:')
+                end_idx = next_start + 2000
+                # Markers only count if they start inside the 2000-char window,
+                # so don't scan the rest of the next section for them
+                search_end = min(end_idx + len('Section Pictures'), next_end)
+                section_pictures_idx = text.find('Section Pictures', next_start, search_end)
+                page_marker_idx = text.find('// Page:', next_start, search_end)
                 
                 if section_pictures_idx != -1 and section_pictures_idx < end_idx:
                     end_idx = section_pictures_idx
                 elif page_marker_idx != -1 and page_marker_idx < end_idx:
                     end_idx = page_marker_idx + 50
                 
-                end_idx = min(end_idx, len(next_section))
-                ratings_section = section + '\n' + next_section[:end_idx]
+                end_idx = min(end_idx, next_end)
+                ratings_section = ratings_section + '\n' + text[next_start:end_idx]
             
             # Try proper format first (label on one line, value on next)
-            qsr_match = re.search(r'QSR\s*:?\s*[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
-            qmr_match = re.search(r'QMR\s*:?\s*[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
-            qor_match = re.search(r'QOR\s*:?\s*[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
-            spr_match = re.search(r'SPR\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-            mpr_match = re.search(r'MPR\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-            spri_match = re.search(r'SPRI\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-            mpri_match = re.search(r'MPRI\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-            opri_match = re.search(r'OPRI\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
-            opr_match = re.search(r'OPR\s*:?\s*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
+            # The first occurrence of each label wins, as with a per-label search
+            rating_matches = {}
+            for rating_match in _RATINGS_RE.finditer(ratings_section):
+                field = rating_match.group(1).lower()
+                if field in rating_matches:
+                    continue
+                value = rating_match.group(3) if _RATING_CAST[field] is int else rating_match.group(2)
+                if value:
+                    rating_matches[field] = value
             
             used_concatenated_format = False
             
             # If proper format didn't work, try concatenated format
-            if not qsr_match:
+            if 'qsr' not in rating_matches:
                 # Look for pattern: QSRQMR... on one line, then all numbers on the next
-                concat_match = re.search(r'QSRQMR[^\n]*[\r\n]+\s*([\d.]+)', ratings_section, re.IGNORECASE)
+                concat_match = _CONCAT_RATINGS_RE.search(ratings_section)
                 if concat_match:
                     numbers_line = concat_match.group(1)
                     # Extract QSR (4 digits), QMR (4 digits), then decimal ratings
@@ -331,7 +500,7 @@ def extract_inspection_reports_text(pdf_path):
                         decimal_part = numbers_line[8:]
                         
                         # Extract all X.Y patterns (single digits only)
-                        decimals = re.findall(r'\d\.\d', decimal_part)
+                        decimals = _DECIMAL_RE.findall(decimal_part)
                         
                         if qsr_str.isdigit() and qmr_str.isdigit() and len(decimals) >= 6:
                             report['qsr'] = int(qsr_str)
@@ -346,35 +515,18 @@ def extract_inspection_reports_text(pdf_path):
                             used_concatenated_format = True
                 
                 # QOR appears separately even in concatenated format
-                if not used_concatenated_format:
-                    qor_match = re.search(r'QOR[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
+                qor_match = _QOR_STRICT_RE.search(ratings_section)
+                if qor_match:
+                    rating_matches['qor'] = qor_match.group(1)
                 else:
-                    qor_match = re.search(r'QOR[\r\n]+\s*(\d+)', ratings_section, re.IGNORECASE)
+                    rating_matches.pop('qor', None)
             
             # Apply matches from proper format only if we didn't use concatenated format
-            if not used_concatenated_format:
-                if qsr_match:
-                    report['qsr'] = int(qsr_match.group(1))
-                if qmr_match:
-                    report['qmr'] = int(qmr_match.group(1))
-                if qor_match:
-                    report['qor'] = int(qor_match.group(1))
-                if spr_match:
-                    report['spr'] = float(spr_match.group(1))
-                if mpr_match:
-                    report['mpr'] = float(mpr_match.group(1))
-                if spri_match:
-                    report['spri'] = float(spri_match.group(1))
-                if mpri_match:
-                    report['mpri'] = float(mpri_match.group(1))
-                if opri_match:
-                    report['opri'] = float(opri_match.group(1))
-                if opr_match:
-                    report['opr'] = float(opr_match.group(1))
-            else:
-                # Even in concatenated format, apply QOR since it appears separately
-                if qor_match:
-                    report['qor'] = int(qor_match.group(1))
+            # (even in concatenated format QOR is applied, since it appears separately)
+            for field, value in rating_matches.items():
+                if used_concatenated_format and field != 'qor':
+                    continue
+                report[field] = _RATING_CAST[field](value)
             
             # Only add if we have at least PSR
             if 'psr' in report:
@@ -387,6 +539,15 @@ def extract_inspection_reports_text(pdf_path):
     
     return reports
 
+def _inspection_reports_from_pages(pdf_bytes, page_texts, page_nos):
+    """Read any of page_nos not yet in page_texts, then parse the reports from all pages
+    
+    page_texts ({page number: text}) is updated in place, so a retry only
+    reads the pages still missing.
+    """
+    page_texts.update(_read_page_texts(pdf_bytes, [page_no for page_no in page_nos if page_no not in page_texts]))
+    return extract_inspection_reports_text([page_texts[page_no] for page_no in sorted(page_texts)])
+
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({'success': False, 'error': 'No PDF file path provided'}))
@@ -398,12 +559,46 @@ def main():
     section_profile_pages = sys.argv[2] if len(sys.argv) > 2 else '1-10'
     
     try:
-        # Extract Section Profile using Camelot (table extraction)
-        print(f"Section Profile pages: {section_profile_pages}", file=sys.stderr)
-        section_profile = extract_section_profile_with_camelot(pdf_path, pages=section_profile_pages)
+        # Read the PDF once; pdfminer parses it from memory. Camelot only
+        # accepts a path, which is already a local temp file from the backend
+        with open(pdf_path, 'rb') as f:
+            pdf_bytes = f.read()
+        
+        try:
+            page_count = sum(1 for _ in PDFPage.get_pages(BytesIO(pdf_bytes)))
+        except Exception as e:
+            print(f"Error extracting text: {e}", file=sys.stderr)
+            page_count = 0
+        
+        # pdfminer first reads only the requested range, to narrow it to the
+        # pages holding the Section Profile table so Camelot parses just those
+        try:
+            range_page_nos = sorted(set(_page_numbers(section_profile_pages, page_count)))
+        except ValueError:
+            range_page_nos = []
+        page_texts = _read_page_texts(pdf_bytes, range_page_nos)
+        camelot_pages = find_section_profile_pages(page_texts, section_profile_pages)
+        _dbg(f"Section Profile pages: {camelot_pages} (requested {section_profile_pages})")
+        
+        # Extract Section Profile using Camelot (table extraction) in a worker
+        # process while the rest of the text is extracted and the Inspection
+        # Reports are parsed here; the two are independent, so wall time is
+        # the slower of the two
+        remaining_page_nos = [page_no for page_no in range(1, page_count + 1) if page_no not in page_texts]
+        section_profile = None
+        inspection_reports = None
+        try:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                section_future = pool.submit(extract_section_profile_with_camelot, pdf_path, camelot_pages)
+                inspection_reports = _inspection_reports_from_pages(pdf_bytes, page_texts, remaining_page_nos)
+                section_profile = section_future.result()
+        except Exception as e:
+            print(f"Parallel extraction failed, running sequentially: {e}", file=sys.stderr)
         
-        # Extract Inspection Reports using text parsing
-        inspection_reports = extract_inspection_reports_text(pdf_path)
+        if section_profile is None:
+            section_profile = extract_section_profile_with_camelot(pdf_path, pages=camelot_pages)
+        if inspection_reports is None:
+            inspection_reports = _inspection_reports_from_pages(pdf_bytes, page_texts, remaining_page_nos)
         
         # Output JSON
         result = {
@@ -419,7 +614,13 @@ def main():
             }
         }
         
-        print(json.dumps(result, indent=2))
+        # Compact by default (indented in debug mode). Output stays
+        # ASCII-escaped: the Node reader decodes each stdout chunk separately,
+        # which would split multi-byte UTF-8 characters at chunk boundaries
+        if _DEBUG:
+            print(json.dumps(result, indent=2))
+        else:
+            print(json.dumps(result, separators=(',', ':')))
         
     except Exception as e:
         print(json.dumps({'success': False, 'error': str(e)}))
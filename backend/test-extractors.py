@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Regression check: pdfParser.py must give the same output whether the text
+comes from PyMuPDF (the default fast path) or from pdfminer's layout analysis
+(--strict-layout). Each fixture below is drawn into a small PDF and parsed
+both ways.
+
+Usage: python test-extractors.py   (needs PyMuPDF installed)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pymupdf
+
+PARSER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdfParser.py')
+
+SECTION_PROFILE = [
+    'Section Profile',
+    'No.  PSR  Upstream MH  Downstream MH  Date  Material  Total Length  Length Surveyed',
+    '1  101  138-33-20-097  138-33-20-098  5/12/2024  VCP  120.50  118.00',
+    '2  102  138-33-20-098  138-33-20-099  5/12/2024  PVC  90.00  90.00',
+    '3  103  138-33-20-099  138-33-20-100  5/13/2024  VCP  45.25  40.10',
+]
+
+REPORT_HEADER = [
+    'Inspection report',
+    'Date: 5/12/2024  Certificate Number: U-1234-5678',
+    'Pipe Segment Ref.: 101',
+    'Upstream MH: 138-33-20-097  Downstream MH: 138-33-20-098',
+    'Total Length: 120.50 \'',
+    '0.00 AMH Manhole start 00:00:01',
+    '12.5 TFA Tap factory 00:01:05',
+]
+
+# Each fixture is a list of rows; a row is drawn as one string per cell, cells
+# spaced out horizontally and drawn left to right, row after row
+FIXTURES = {
+    'ratings one per line': [
+        ['QSR'], ['3211'], ['QMR'], ['4100'], ['SPR'], ['7.0'], ['OPRI'], ['1.5'],
+    ],
+    'ratings grid': [
+        ['QSR', 'QMR', 'SPR'],
+        ['1234', '2100', '2.5'],
+    ],
+    'ratings grid, two blocks': [
+        ['QSR', 'QMR', 'QOR'],
+        ['1234', '2100', '3211'],
+        ['SPR', 'MPR', 'OPR'],
+        ['2.5', '3.0', '5.5'],
+    ],
+    'ratings drawn before the report': [
+        ['QSR'], ['3211'], ['SPR'], ['7.0'],
+    ],
+}
+
+# Fixtures whose rows are drawn before the report header (still placed below
+# it on the page), so PyMuPDF's content-order text puts them ahead of it
+DRAWN_FIRST = {'ratings drawn before the report'}
+
+def build_pdf(path, rows, drawn_first=False):
+    """Draw the Section Profile, then one inspection report ending in rows"""
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        y = 72
+        for line in SECTION_PROFILE:
+            page.insert_text((40, y), line, fontsize=8)
+            y += 14
+        page = doc.new_page()
+        header = [((40, 72 + 14 * i), line) for i, line in enumerate(REPORT_HEADER)]
+        rows_top = 72 + 14 * (len(REPORT_HEADER) + 1)
+        cells = [
+            ((40 + 70 * i, rows_top + 14 * row_no), cell)
+            for row_no, row in enumerate(rows)
+            for i, cell in enumerate(row)
+        ]
+        for point, text in (cells + header if drawn_first else header + cells):
+            page.insert_text(point, text)
+        doc.save(path)
+
+def parse(path, *flags):
+    result = subprocess.run([sys.executable, PARSER, path, *flags], capture_output=True, text=True)
+    return json.loads(result.stdout)
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, rows in FIXTURES.items():
+            path = os.path.join(tmp, 'fixture.pdf')
+            build_pdf(path, rows, name in DRAWN_FIRST)
+            fast = parse(path)
+            layout = parse(path, '--strict-layout')
+            if fast == layout and fast['success']:
+                print(f"✓ {name}")
+            else:
+                failures += 1
+                print(f"✗ {name}")
+                print(f"  PyMuPDF:  {json.dumps(fast.get('data', fast).get('inspectionReports', fast))}")
+                print(f"  pdfminer: {json.dumps(layout.get('data', layout).get('inspectionReports', layout))}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()